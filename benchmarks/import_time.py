@@ -0,0 +1,62 @@
+# Copyright 2020 Nir Harel
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the cold import time of the package, and which heavy dependencies it loads.
+
+Every measurement runs in a fresh interpreter. Run it from the root of the repository:
+
+    python benchmarks/import_time.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("asyncio", "aiohttp", "requests", "dateutil", "unidecode", "async_lru")
+
+SCENARIOS = {
+    "interpreter only": "pass",
+    "import launchlibrary": "import launchlibrary",
+    "sync api": "import launchlibrary; launchlibrary.Api()",
+    "async models": "import launchlibrary; launchlibrary.AsyncLaunch",
+}
+
+MEASURE = """
+import sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(code: str):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    output = subprocess.check_output([sys.executable, "-c", MEASURE.format(code=code, heavy=HEAVY_MODULES)],
+                                     env=env, universal_newlines=True)
+    elapsed, _, loaded = output.strip().partition(" ")
+    return float(elapsed), loaded
+
+
+def main(runs: int):
+    for name, code in SCENARIOS.items():
+        results = [measure(code) for _ in range(runs)]
+        median_ms = statistics.median(elapsed for elapsed, _ in results) * 1000
+        print("{:<22} {:>8.1f} ms   loaded: {}".format(name, median_ms, results[-1][1] or "-"))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
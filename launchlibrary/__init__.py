@@ -12,9 +12,36 @@
 #    See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .api import Api
+from importlib import import_module
+from .api import Api, WarmupReport
 from .models import *
 from .exceptions import *
 from .utils import *
-from .async_models import *
+from .network import deadline_scope, priority_scope
+from .constants import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from .query import Query
+from .serialization import to_dicts, to_json
+from .geo import PadIndex
+
+# These are imported on first use, so sync users don't have to load the async stack
+_LAZY_NAMES = {
+    "AsyncAgency": ".async_models", "AsyncLaunch": ".async_models", "AsyncUpcomingLaunch": ".async_models",
+    "AsyncPad": ".async_models", "AsyncLocation": ".async_models", "AsyncRocket": ".async_models",
+    "BaseAsync": ".async_models", "LaunchWatcher": ".watcher", "AsyncLaunchWatcher": ".watcher",
+    "LaunchEvent": ".watcher", "LoopEngine": ".engine", "DEFAULT_DT": ".models",
+}
+
+# A star import exports the lazy names too, so it loads the async stack like it used to
+__all__ = [name for name in globals() if not name.startswith("_") and name != "import_module"] + list(_LAZY_NAMES)
+
+
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        return getattr(import_module(_LAZY_NAMES[name], __name__), name)
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_NAMES))
 
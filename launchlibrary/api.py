@@ -12,85 +12,319 @@
 #    See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .async_models import *
+from .models import *
 from .constants import *
-from typing import List
+from .query import Query
+from .geo import PadIndex
+from typing import List, Iterable, Union, Dict, NamedTuple
+import time
+
+# The reference endpoints that warm() loads
+WARM_MODELS = (Agency, Location, Pad, Rocket)
+
+
+class WarmupReport(NamedTuple):
+    """The result of Api.warm."""
+    elapsed: float  # Seconds
+    counts: Dict[str, int]  # The number of objects loaded from every endpoint
+
+# The async models and the watchers are imported on first use, so sync users don't have to load the async stack
 
 
 class Api:
-    def __init__(self, api_url: str = DEFAULT_LL_URL, version: str = DEFAULT_VERSION, unicode: bool = True):
+    def __init__(self, api_url: str = DEFAULT_LL_URL, version: str = DEFAULT_VERSION, unicode: bool = True,
+                 hedge_delay: float = None, hedge_percentile: float = None, hedge_budget: float = 0.1,
+                 engine: Union[bool, "LoopEngine"] = None, connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 reserved_share: float = DEFAULT_RESERVED_SHARE):
         """
         The API class for the launchlibrary module.
 
         :param api_url: The URL of the launchlibrary website.
         :param version: Version of the api
         :param unicode: Set to False to convert unicode characters to ASCII using unidecode.
+        :param hedge_delay: Send a duplicate async request if the first one didn't complete after this many seconds.
+        :param hedge_percentile: Send a duplicate async request if the first one takes longer than this percentile
+                                 (0-100) of the recent response times.
+        :param hedge_budget: The maximal ratio of duplicate requests to requests.
+        :param engine: Set to True, or pass a LoopEngine to share its thread between instances, to run all requests
+                       on a background event loop. Sync and async calls of the instance then share its connection pool
+                       and cache.
+        :param connect_timeout: The maximal number of seconds to wait for a connection.
+        :param read_timeout: The maximal number of seconds to wait between bytes of a response.
+        :param max_concurrency: The maximal number of concurrent async requests, and connections.
+        :param reserved_share: The share of max_concurrency that's reserved for interactive priority async requests.
         """
 
         # These probably shouldn't be changed unless the site changed its address. The wrapper may not work as well
         # with a different version than the default one.
         url = "/".join([api_url, version])
-        self.network = Network(url, "detailed")
+        if engine is True:
+            from .engine import LoopEngine
+            engine = LoopEngine()
 
-        global DO_UNIDECODE
-        # I know that this is super hacky, but it'll work for almost all users.
-        # Fix it and submit a PR if you care.
-        DO_UNIDECODE = unicode
+        self.network = Network(url, "detailed", unicode, hedge_delay, hedge_percentile, hedge_budget, engine or None,
+                               connect_timeout, read_timeout, max_concurrency, reserved_share)
 
-    def fetch_agency(self, **kwargs):
-        """Fetch from the Agency endpoint"""
-        return Agency.fetch(self.network, **kwargs)
+    def fetch_agency(self, fields: Iterable[str] = None, deadline: float = None, **kwargs):
+        """
+        Fetch from the Agency endpoint
 
-    def fetch_launch(self, **kwargs):
-        """Fetch from the Launch endpoint"""
-        return Launch.fetch(self.network, **kwargs)
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        """
+        return Agency.fetch(self.network, fields, deadline, **kwargs)
 
-    def next_launches(self, num: int) -> List[UpcomingLaunch]:
+    def fetch_launch(self, fields: Iterable[str] = None, deadline: float = None, **kwargs):
+        """
+        Fetch from the Launch endpoint
+
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        """
+        return Launch.fetch(self.network, fields, deadline, **kwargs)
+
+    def next_launches(self, num: int, fields: Iterable[str] = None, deadline: float = None) -> List[UpcomingLaunch]:
         """
         Get the next {num} launches.
 
         :param num: a number for the number of launches
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        """
+        return UpcomingLaunch.next(self.network, num, fields, deadline)
+
+    def fetch_pad(self, fields: Iterable[str] = None, deadline: float = None, **kwargs):
+        """
+        Fetch from the Pad endpoint
+
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        """
+        return Pad.fetch(self.network, fields, deadline, **kwargs)
+
+    def fetch_location(self, fields: Iterable[str] = None, deadline: float = None, **kwargs):
+        """
+        Fetch from the Location endpoint
+
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        """
+        return Location.fetch(self.network, fields, deadline, **kwargs)
+
+    def fetch_rocket(self, fields: Iterable[str] = None, deadline: float = None, **kwargs):
+        """
+        Fetch from the Rocket endpoint
+
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        """
+        return Rocket.fetch(self.network, fields, deadline, **kwargs)
+
+    def warm(self, deadline: float = None) -> WarmupReport:
+        """
+        Concurrently loads all of the agencies, locations, pads and rocket configurations into the network's catalog.
+        Nested models and Rocket.get_pads are then served from the catalog instead of being created or fetched.
+
+        :param deadline: Raise TimeoutException if the warmup doesn't complete within this many seconds
+        """
+        start = time.monotonic()
+        # The catalog holds the sync models, as those are the ones that nested models are created as
+        queries = [Query(self.network, model, model).all() for model in WARM_MODELS]
+        if self.network.engine is not None:
+            results = self.network.engine.run(_gather([query.async_fetch(deadline) for query in queries]))
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(len(queries)) as executor:
+                results = list(executor.map(lambda query: query.fetch(deadline), queries))
+
+        return self._store_catalog(results, time.monotonic() - start)
+
+    async def async_warm(self, deadline: float = None) -> WarmupReport:
+        """
+        Concurrently loads all of the agencies, locations, pads and rocket configurations into the network's catalog.
+        Nested models and Rocket.get_pads are then served from the catalog instead of being created or fetched.
+
+        :param deadline: Raise TimeoutException if the warmup doesn't complete within this many seconds
+        """
+        start = time.monotonic()
+        # The catalog holds the sync models, as those are the ones that nested models are created as
+        queries = [Query(self.network, model, model).all() for model in WARM_MODELS]
+        results = await _gather([query.async_fetch(deadline) for query in queries])
+
+        return self._store_catalog(results, time.monotonic() - start)
+
+    def _store_catalog(self, results: List[list], elapsed: float) -> WarmupReport:
+        counts = {}
+        for model, objects in zip(WARM_MODELS, results):
+            self.network.catalog[model._endpoint_name] = {obj.id: obj for obj in objects}
+            counts[model._endpoint_name] = len(objects)
+
+        return WarmupReport(elapsed, counts)
+
+    def gather(self, *coroutines) -> list:
+        """
+        Runs coroutines of the async api concurrently on the engine, and returns their results. Lets sync code issue
+        concurrent requests, like ``api.gather(api.async_fetch_launch(id=1), api.async_fetch_pad(id=2))``.
+
+        :param coroutines: Coroutines of the async api
+        """
+        if self.network.engine is None:
+            for coroutine in coroutines:
+                coroutine.close()
+            raise ValueError("Api.gather requires an engine")
+
+        return self.network.engine.run(_gather(coroutines))
+
+    # Queries
+
+    def agencies(self) -> Query:
+        """Query the Agency endpoint"""
+        return Query(self.network, Agency)
+
+    def launches(self) -> Query:
+        """Query the Launch endpoint"""
+        return Query(self.network, Launch)
+
+    def upcoming_launches(self) -> Query:
+        """Query the upcoming launches endpoint"""
+        return Query(self.network, UpcomingLaunch)
+
+    def pads(self) -> Query:
+        """Query the Pad endpoint"""
+        return Query(self.network, Pad)
+
+    def locations(self) -> Query:
+        """Query the Location endpoint"""
+        return Query(self.network, Location)
+
+    def rockets(self) -> Query:
+        """Query the Rocket endpoint"""
+        return Query(self.network, Rocket)
+
+    def pad_index(self, **filters) -> PadIndex:
         """
-        return UpcomingLaunch.next(self.network, num)
+        Fetch all of the pads into an index for radius and nearest pad queries. Requires numpy.
 
-    def fetch_pad(self, **kwargs):
-        """Fetch from the Pad endpoint"""
-        return Pad.fetch(self.network, **kwargs)
+        :param filters: Filters for the pad query
+        """
+        return PadIndex(self.pads().where(**filters).all().fetch())
 
-    def fetch_location(self, **kwargs):
-        """Fetch from the Location endpoint"""
-        return Location.fetch(self.network, **kwargs)
+    def watch_launches(self, num: int = 10, **kwargs) -> "LaunchWatcher":
+        """
+        Get a watcher that polls the next {num} launches and reports their changes.
 
-    def fetch_rocket(self, **kwargs):
-        """Fetch from the Rocket endpoint"""
-        return Rocket.fetch(self.network, **kwargs)
+        :param num: a number for the number of launches
+        :param kwargs: Additional arguments for the LaunchWatcher
+        """
+        from .watcher import LaunchWatcher
+
+        return LaunchWatcher(self.network, num, **kwargs)
 
     # Async fetchers
 
-    async def async_fetch_agency(self, **kwargs):
-        """Fetch from the Agency endpoint"""
-        return await AsyncAgency.fetch(self.network, **kwargs)
+    async def async_fetch_agency(self, fields: Iterable[str] = None, deadline: float = None, priority: int = None,
+                                 **kwargs):
+        """
+        Fetch from the Agency endpoint
+
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        :param priority: PRIORITY_INTERACTIVE (the default) or PRIORITY_BACKGROUND, for bulk jobs
+        """
+        from .async_models import AsyncAgency
+
+        return await AsyncAgency.fetch(self.network, fields, deadline, priority, **kwargs)
 
-    async def async_fetch_launch(self, **kwargs):
-        """Fetch from the Launch endpoint"""
-        return await AsyncLaunch.fetch(self.network, **kwargs)
+    async def async_fetch_launch(self, fields: Iterable[str] = None, deadline: float = None, priority: int = None,
+                                 **kwargs):
+        """
+        Fetch from the Launch endpoint
 
-    async def async_next_launches(self, num: int) -> List[AsyncUpcomingLaunch]:
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        :param priority: PRIORITY_INTERACTIVE (the default) or PRIORITY_BACKGROUND, for bulk jobs
+        """
+        from .async_models import AsyncLaunch
+
+        return await AsyncLaunch.fetch(self.network, fields, deadline, priority, **kwargs)
+
+    async def async_next_launches(self, num: int, fields: Iterable[str] = None, deadline: float = None,
+                                  priority: int = None) -> List["AsyncUpcomingLaunch"]:
         """
         Get the next {num} launches.
 
         :param num: a number for the number of launches
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        :param priority: PRIORITY_INTERACTIVE (the default) or PRIORITY_BACKGROUND, for bulk jobs
+        """
+        from .async_models import AsyncUpcomingLaunch
+
+        return await AsyncUpcomingLaunch.next(self.network, num, fields, deadline, priority)
+
+    async def async_fetch_pad(self, fields: Iterable[str] = None, deadline: float = None, priority: int = None,
+                              **kwargs):
+        """
+        Fetch from the Pad endpoint
+
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        :param priority: PRIORITY_INTERACTIVE (the default) or PRIORITY_BACKGROUND, for bulk jobs
+        """
+        from .async_models import AsyncPad
+
+        return await AsyncPad.fetch(self.network, fields, deadline, priority, **kwargs)
+
+    async def async_fetch_location(self, fields: Iterable[str] = None, deadline: float = None, priority: int = None,
+                                   **kwargs):
+        """
+        Fetch from the Location endpoint
+
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        :param priority: PRIORITY_INTERACTIVE (the default) or PRIORITY_BACKGROUND, for bulk jobs
+        """
+        from .async_models import AsyncLocation
+
+        return await AsyncLocation.fetch(self.network, fields, deadline, priority, **kwargs)
+
+    async def async_fetch_rocket(self, fields: Iterable[str] = None, deadline: float = None, priority: int = None,
+                                 **kwargs):
+        """
+        Fetch from the Rocket endpoint
+
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots)
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds
+        :param priority: PRIORITY_INTERACTIVE (the default) or PRIORITY_BACKGROUND, for bulk jobs
+        """
+        from .async_models import AsyncRocket
+
+        return await AsyncRocket.fetch(self.network, fields, deadline, priority, **kwargs)
+
+    async def async_pad_index(self, **filters) -> PadIndex:
+        """
+        Fetch all of the pads into an index for radius and nearest pad queries. Requires numpy.
+
+        :param filters: Filters for the pad query
+        """
+        return PadIndex(await self.pads().where(**filters).all().async_fetch())
+
+    def async_watch_launches(self, num: int = 10, **kwargs) -> "AsyncLaunchWatcher":
+        """
+        Get a watcher that asynchronously polls the next {num} launches and reports their changes.
+
+        :param num: a number for the number of launches
+        :param kwargs: Additional arguments for the AsyncLaunchWatcher
         """
-        return await AsyncUpcomingLaunch.next(self.network, num)
+        from .watcher import AsyncLaunchWatcher
+
+        return AsyncLaunchWatcher(self.network, num, **kwargs)
 
-    async def async_fetch_pad(self, **kwargs):
-        """Fetch from the Pad endpoint"""
-        return await AsyncPad.fetch(self.network, **kwargs)
 
-    async def async_fetch_location(self, **kwargs):
-        """Fetch from the Location endpoint"""
-        return await AsyncLocation.fetch(self.network, **kwargs)
+async def _gather(coroutines) -> list:
+    # asyncio.gather needs a running loop, so it's called from the engine's loop
+    import asyncio
 
-    async def async_fetch_rocket(self, **kwargs):
-        """Fetch from the Rocket endpoint"""
-        return await AsyncRocket.fetch(self.network, **kwargs)
+    return list(await asyncio.gather(*coroutines))
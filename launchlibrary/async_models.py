@@ -1,6 +1,6 @@
 from launchlibrary.models import *
 from async_lru import alru_cache
-from .network import Network
+from .network import Network, deadline_scope, priority_scope
 
 
 class BaseAsync(BaseModel):
@@ -9,23 +9,36 @@ class BaseAsync(BaseModel):
         super().__init__(network, param_translations, proper_name)
 
     @classmethod
-    async def fetch(cls, network: Network, **kwargs):
+    async def fetch(cls, network: Network, fields: Iterable[str] = None, deadline: float = None, priority: int = None,
+                    **kwargs):
         """
         The fetch method implements fetch with an async HTTP GET function.
 
         :param network: A network instance
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots). Defaults to all.
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds.
+        :param priority: PRIORITY_INTERACTIVE (the default) or PRIORITY_BACKGROUND.
         :param kwargs: args for the api call
         :return: objects based on BaseAsync
         """
 
-        kwargs = utils.sanitize_input(kwargs)
+        # The values are escaped by urlencode, but the mode is always set by the network
+        kwargs.pop("mode", None)
 
-        json_object = await network.async_send_message(cls._endpoint_name, kwargs)
+        with deadline_scope(deadline), priority_scope(priority):
+            json_object = await network.async_send_message(cls._endpoint_name, kwargs)
 
-        classes = cls._create_classes(network, json_object)
+        classes = cls._create_classes(network, json_object, utils.parse_fields(fields))
         return classes
 
 
+def _to_async(model: BaseModel) -> BaseModel:
+    """Converts a model from the catalog, which always holds sync models, to its async variant."""
+    async_model = ASYNC_MODELS[type(model)](model.network)
+    async_model.__dict__.update(model.__dict__)
+    return async_model
+
+
 # All async models should be based on this, and all functions that use fetch should be reimplemented
 class AsyncAgency(Agency, BaseAsync):
     """A class representing an async agency object."""
@@ -39,15 +52,19 @@ class AsyncUpcomingLaunch(UpcomingLaunch, BaseAsync):
     """A class representing an upcoming launch object."""
 
     @classmethod
-    async def next(cls, network: Network, num: int):
+    async def next(cls, network: Network, num: int, fields: Iterable[str] = None, deadline: float = None,
+                   priority: int = None):
         """
         Get the next {num} launches.
 
         :param network: A network instance
 
         :param num: a number for the number of launches
+        :param fields: Only build these fields. Defaults to all.
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds.
+        :param priority: PRIORITY_INTERACTIVE (the default) or PRIORITY_BACKGROUND.
         """
-        return await cls.fetch(network)
+        return await cls.fetch(network, fields, deadline, priority, limit=num, status=1)
 
 
 class AsyncPad(Pad, BaseAsync):
@@ -65,13 +82,35 @@ class AsyncRocket(Rocket, BaseAsync):
 
     @staticmethod
     @alru_cache()
-    async def _get_pads_for_id(network: Network, pads: str):
-        return await AsyncPad.fetch(network, id=pads)
+    async def _get_pads_json_for_id(network: Network, pads: str) -> dict:
+        # The JSON is cached rather than the models, so sync and async callers can each build their own
+        return await network.async_send_message(Pad._endpoint_name, {"id": pads})
+
+    async def get_pads(self, deadline: float = None, priority: int = None) -> List[AsyncPad]:
+        """
+        Returns Pad type objects of the pads the rocket uses.
+
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds.
+        :param priority: PRIORITY_INTERACTIVE (the default) or PRIORITY_BACKGROUND.
+        """
+        if not self.default_pads:
+            return []
+
+        catalog_pads = self._get_catalog_pads()
+        if catalog_pads is not None:
+            return [_to_async(pad) for pad in catalog_pads]
+
+        with deadline_scope(deadline), priority_scope(priority):
+            if self.network.engine is not None:
+                # The cache is bound to a loop, so it's always used from the engine's loop
+                json_object = await self.network.engine.run_async(
+                    AsyncRocket._get_pads_json_for_id(self.network, self.default_pads))
+            else:
+                json_object = await AsyncRocket._get_pads_json_for_id(self.network, self.default_pads)
+
+        return AsyncPad._create_classes(self.network, json_object)
 
-    async def get_pads(self) -> List[AsyncPad]:
-        """Returns Pad type objects of the pads the rocket uses."""
-        pad_objs = []
-        if self.default_pads:
-            pad_objs = await AsyncRocket._get_pads_for_id(self.network, self.default_pads)
 
-        return pad_objs
+# The async variant of every model, for queries
+ASYNC_MODELS = {Agency: AsyncAgency, Launch: AsyncLaunch, UpcomingLaunch: AsyncUpcomingLaunch, Pad: AsyncPad,
+                Location: AsyncLocation, Rocket: AsyncRocket}
@@ -1,3 +1,13 @@
 DEFAULT_LL_URL = "https://ll.thespacedevs.com"
 DEFAULT_VERSION = "2.0.0"
 DEFAULT_API_URL = "/".join([DEFAULT_LL_URL, DEFAULT_VERSION])
+TRANSLITERATION_CACHE_SIZE = 4096
+PAGE_LIMIT = 100  # The maximal number of results the api returns in a single page
+HEDGE_LATENCY_SAMPLES = 200  # The number of recent response times used for the hedging percentile
+HEDGE_MIN_SAMPLES = 20  # Hedging by percentile only starts after this many responses
+DEFAULT_CONNECT_TIMEOUT = 10  # Seconds
+DEFAULT_READ_TIMEOUT = 30  # Seconds
+PRIORITY_INTERACTIVE = 0  # May use all of the connections
+PRIORITY_BACKGROUND = 1  # Can't use the connections that are reserved for interactive requests
+DEFAULT_MAX_CONCURRENCY = 100  # The same as aiohttp's default connection limit
+DEFAULT_RESERVED_SHARE = 0.2  # The share of the connections that's reserved for interactive requests
@@ -0,0 +1,102 @@
+# Copyright 2020 Nir Harel
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A background event loop that runs the async transport for both sync and async callers."""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from typing import Coroutine
+
+
+class LoopEngine:
+    """Runs an event loop in a daemon thread, which is started on first use.
+
+    When a network uses an engine, all of its requests run on the engine's loop, from both sync and async callers.
+    They share the network's aiohttp session, and the caches that are bound to it. An engine may be shared between
+    multiple Api instances, which only shares the loop's thread, as every network has its own session and caches."""
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The engine's event loop. Starts the engine if it isn't running."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="launchlibrary-engine",
+                                                daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def in_loop(self) -> bool:
+        """Returns True if it's called from the engine's loop."""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedules a coroutine on the engine's loop, and returns a future for its result. The coroutine sees the
+        context variables of the caller, like the deadline of the call."""
+        return asyncio.run_coroutine_threadsafe(_run_in_context(coro, contextvars.copy_context()), self.loop)
+
+    def run(self, coro: Coroutine, timeout: float = None):
+        """
+        Runs a coroutine on the engine's loop, and blocks until it's done. Must not be called from the engine's loop.
+
+        :param coro: The coroutine to run
+        :param timeout: The maximal number of seconds to wait for the result. The coroutine is cancelled if it
+                        doesn't complete in time, and concurrent.futures.TimeoutError is raised.
+        :return: The result of the coroutine
+        """
+        if self.in_loop():
+            raise RuntimeError("LoopEngine.run can't block the engine's own loop")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    async def run_async(self, coro: Coroutine):
+        """Awaits a coroutine on the engine's loop from any other loop."""
+        if self.in_loop():
+            return await coro
+
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def stop(self):
+        """Stops the engine's loop and waits for its thread. Meant for shutdown, as the sessions that were created on
+        the loop can't be used after it stops."""
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+async def _run_in_context(coro: Coroutine, context: contextvars.Context):
+    # The task got a copy of the engine thread's context, so the caller's values are set in it
+    for var, value in context.items():
+        var.set(value)
+    return await coro
@@ -0,0 +1,196 @@
+# Copyright 2020 Nir Harel
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A geospatial index over pads. Requires numpy, which is installed with the geo extra."""
+
+from typing import Iterable, List, Tuple
+from .models import Pad
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _get_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("PadIndex requires numpy. Install it with: pip install python-launch-library[geo]") from None
+    return numpy
+
+
+def _to_float(value):
+    """The api returns coordinates as strings. Returns None if they can't be converted."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PadIndex:
+    """An index of pad coordinates, that answers radius and nearest pad queries with vectorized great-circle math.
+
+    Pads without valid coordinates are skipped. Distances are in kilometers, and results are sorted by distance.
+
+    .. code:: py
+
+      index = api.pad_index()
+      nearby = index.within(28.5, -80.6, 200)
+      (pad, distance), = index.nearest(28.5, -80.6, active_only=True)
+    """
+
+    def __init__(self, pads: Iterable[Pad] = ()):
+        """
+        :param pads: The pads to index.
+        """
+        np = _get_numpy()
+        self._pads = []
+        self._rows = {}  # Pad id to its row in the arrays
+        self._lat = np.empty(0)  # In radians
+        self._lon = np.empty(0)  # In radians
+        self._retired = np.empty(0, dtype=bool)
+        self.update(pads)
+
+    def __len__(self) -> int:
+        return len(self._pads)
+
+    def update(self, pads: Iterable[Pad]):
+        """
+        Adds pads to the index, replacing the indexed pads that have the same ids.
+
+        :param pads: The pads to add or replace.
+        """
+        np = _get_numpy()
+        new_pads, new_lat, new_lon, new_retired = [], [], [], []
+        invalid = []
+        # The last pad of every id wins, like it would if they were added one by one
+        for pad in {pad.id: pad for pad in pads}.values():
+            lat, lon = _to_float(pad.latitude), _to_float(pad.longitude)
+            if lat is None or lon is None:
+                invalid.append(pad.id)
+                continue
+
+            retired = bool(getattr(pad, "retired", False))
+            row = self._rows.get(pad.id)
+            if row is not None:
+                self._pads[row] = pad
+                self._lat[row], self._lon[row] = np.radians(lat), np.radians(lon)
+                self._retired[row] = retired
+            else:
+                self._rows[pad.id] = len(self._pads) + len(new_pads)
+                new_pads.append(pad)
+                new_lat.append(lat)
+                new_lon.append(lon)
+                new_retired.append(retired)
+
+        if new_pads:
+            self._pads.extend(new_pads)
+            self._lat = np.concatenate([self._lat, np.radians(new_lat)])
+            self._lon = np.concatenate([self._lon, np.radians(new_lon)])
+            self._retired = np.concatenate([self._retired, np.array(new_retired, dtype=bool)])
+
+        # Indexed pads whose coordinates are no longer valid would keep their stale coordinates
+        self.remove(invalid)
+
+    def remove(self, ids: Iterable):
+        """
+        Removes pads from the index.
+
+        :param ids: The ids of the pads to remove. Ids that aren't indexed are ignored.
+        """
+        np = _get_numpy()
+        removed = [self._rows[pad_id] for pad_id in ids if pad_id in self._rows]
+        if not removed:
+            return
+
+        keep = np.ones(len(self._pads), dtype=bool)
+        keep[removed] = False
+        self._pads = [pad for pad, kept in zip(self._pads, keep) if kept]
+        self._lat, self._lon, self._retired = self._lat[keep], self._lon[keep], self._retired[keep]
+        self._rows = {pad.id: row for row, pad in enumerate(self._pads)}
+
+    def refresh(self, api, prune: bool = False, **filters):
+        """
+        Fetches the pads from the api and updates the index with them.
+
+        :param api: An instance of launchlibrary.Api
+        :param prune: Remove the indexed pads that weren't returned by the api.
+        :param filters: Filters for the pad query.
+        """
+        self._refresh(api.pads().where(**filters).all().fetch(), prune)
+
+    async def async_refresh(self, api, prune: bool = False, **filters):
+        """
+        Asynchronously fetches the pads from the api and updates the index with them.
+
+        :param api: An instance of launchlibrary.Api
+        :param prune: Remove the indexed pads that weren't returned by the api.
+        :param filters: Filters for the pad query.
+        """
+        self._refresh(await api.pads().where(**filters).all().async_fetch(), prune)
+
+    def _refresh(self, pads: List[Pad], prune: bool):
+        if prune:
+            fetched = {pad.id for pad in pads}
+            self.remove([pad_id for pad_id in self._rows if pad_id not in fetched])
+        self.update(pads)
+
+    def distances(self, latitude: float, longitude: float):
+        """Returns a numpy array of the distances from the point to every indexed pad, in kilometers."""
+        np = _get_numpy()
+        lat, lon = np.radians(latitude), np.radians(longitude)
+        # The haversine formula
+        a = np.sin((self._lat - lat) / 2) ** 2 + np.cos(lat) * np.cos(self._lat) * np.sin((self._lon - lon) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+    def _results(self, rows, distances) -> List[Tuple[Pad, float]]:
+        return [(self._pads[row], float(distances[row])) for row in rows]
+
+    def within(self, latitude: float, longitude: float, radius_km: float,
+               active_only: bool = False) -> List[Tuple[Pad, float]]:
+        """
+        Returns the pads within {radius_km} of the point, with their distances.
+
+        :param latitude: The latitude of the point, in degrees
+        :param longitude: The longitude of the point, in degrees
+        :param radius_km: The radius, in kilometers
+        :param active_only: Skip retired pads
+        """
+        np = _get_numpy()
+        distances = self.distances(latitude, longitude)
+        matches = distances <= radius_km
+        if active_only:
+            matches &= ~self._retired
+
+        rows = np.flatnonzero(matches)
+        return self._results(rows[np.argsort(distances[rows])], distances)
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1,
+                active_only: bool = False) -> List[Tuple[Pad, float]]:
+        """
+        Returns the {k} nearest pads to the point, with their distances.
+
+        :param latitude: The latitude of the point, in degrees
+        :param longitude: The longitude of the point, in degrees
+        :param k: The number of pads to return
+        :param active_only: Skip retired pads
+        """
+        if k < 0:
+            raise ValueError("The number of nearest pads can't be negative")
+
+        np = _get_numpy()
+        distances = self.distances(latitude, longitude)
+        rows = np.flatnonzero(~self._retired) if active_only else np.arange(len(distances))
+        if k < len(rows):
+            rows = rows[np.argpartition(distances[rows], k)[:k]]
+
+        return self._results(rows[np.argsort(distances[rows])], distances)
@@ -12,20 +12,22 @@
 #    See the License for the specific language governing permissions and
 # limitations under the License.
 
-from unidecode import unidecode
-from dateutil import parser
-from dateutil import relativedelta
 from functools import lru_cache
 import datetime
-from typing import List
+from typing import List, Iterable, Optional
 from launchlibrary import utils
-from .network import Network
+from .network import Network, deadline_scope
 
-# Set default dt to the beginning of next month
-DEFAULT_DT = datetime.datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0) \
-             + relativedelta.relativedelta(months=1)
 
-DO_UNIDECODE = False
+def __getattr__(name):
+    # DEFAULT_DT is computed on first use, so importing the models doesn't need dateutil
+    if name == "DEFAULT_DT":
+        from dateutil import relativedelta
+        # Set default dt to the beginning of next month
+        return datetime.datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0) \
+            + relativedelta.relativedelta(months=1)
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
 
 class BaseModel:
@@ -60,79 +62,110 @@ class BaseModel:
         self.param_names = self._param_translations.values()
 
     @classmethod
-    def fetch(cls, network: Network, **kwargs) -> list:
+    def fetch(cls, network: Network, fields: Iterable[str] = None, deadline: float = None, **kwargs) -> list:
         """
         Initializes a class, or even a list of them from the api using the needed params.
 
         :param network: An instance of the network class
+        :param fields: Only build these fields (pythonic or API names, nested ones separated by dots). Defaults to all.
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds.
         :param kwargs: Arguments to include in the GET request
         """
 
-        kwargs = utils.sanitize_input(kwargs)
+        # The values are escaped by urlencode, but the mode is always set by the network
+        kwargs.pop("mode", None)
 
-        json_object = network.send_message(cls._endpoint_name, kwargs)
+        with deadline_scope(deadline):
+            json_object = network.send_message(cls._endpoint_name, kwargs)
 
-        classes = cls._create_classes(network, json_object)
+        classes = cls._create_classes(network, json_object, utils.parse_fields(fields))
 
         return classes
 
     @classmethod
-    def init_from_json(cls, network: Network, json_object: dict):
+    def init_from_json(cls, network: Network, json_object: dict, projection: dict = None):
         """
         Initializes a class from a json object. Only single classes.
 
         :param network: launchlibrary.Network
         :param json_object: An object containing the "entry" we want to init.
+        :param projection: A projection tree from utils.parse_fields. None means all fields.
         :return: cls
         """
         cls_init = cls(network)
-        cls_init._set_params_json(json_object)
+        cls_init._set_params_json(json_object, projection)
         cls_init._postprocess()
         return cls_init
 
     @classmethod
-    def _create_classes(cls, network: Network, json_object) -> list:
+    def _create_classes(cls, network: Network, json_object, projection: dict = None) -> list:
         """
         Creates the required classes from the json object.
 
         :param network:
         :param json_object:
+        :param projection: A projection tree from utils.parse_fields. None means all fields.
         :return:
         """
 
-        classes = []
-        for entry in json_object.get("results", []):
-            cls_init = cls(network)
-            cls_init._set_params_json(entry)
-            cls_init._postprocess()
-            classes.append(cls_init)
+        return [cls.init_from_json(network, entry, projection) for entry in json_object.get("results", [])]
 
-        return classes
+    def _project(self, projection: dict) -> dict:
+        """
+        Returns the translations that were requested in the projection, along with the sub-projection of each one.
 
-    def _set_params_json(self, json_object: dict):
-        """Sets the parameters of a class from an object (raw data, not inside "agencies" for example)"""
-        self._modelize(json_object)
+        :param projection: A projection tree from utils.parse_fields. None means all fields.
+        :return: A dict of {api_name: (pythonic_name, sub_projection)}
+        """
+        if projection is None:
+            return {api_name: (pythonic_name, None) for api_name, pythonic_name in self._param_translations.items()}
+
+        projected = {}
         for api_name, pythonic_name in self._param_translations.items():
-            data = json_object.get(api_name, None)
+            if api_name in projection:
+                projected[api_name] = (pythonic_name, projection[api_name])
+            elif pythonic_name in projection:
+                projected[api_name] = (pythonic_name, projection[pythonic_name])
+
+        return projected
+
+    def _set_params_json(self, json_object: dict, projection: dict = None):
+        """Sets the parameters of a class from an object (raw data, not inside "agencies" for example)"""
+        projected = self._project(projection)
+        if projection is not None:
+            # Only the projected fields are reported, so repr and friends stay compact
+            self.param_names = [pythonic_name for pythonic_name, _ in projected.values()]
+
+        for api_name, (pythonic_name, sub_projection) in projected.items():
+            data = self._modelize(api_name, json_object.get(api_name, None), sub_projection)
             # If the data is a string, and the unicode option is set to false
-            if isinstance(data, str) and DO_UNIDECODE:
-                data = unidecode(data)
+            if isinstance(data, str) and not self.network.unicode:
+                data = utils.transliterate(data)
 
             setattr(self, pythonic_name, data)
 
-    def _modelize(self, json_object):
-        """Recursively goes over the json object, looking for any compatible models. It's recursive in an indirect
+    def _modelize(self, key: str, val, projection: dict = None):
+        """Turns a json value into a model, if it's compatible with one. It's recursive in an indirect
         way (through set_params_json)."""
 
-        for key, val in json_object.items():
-            if key in MODEL_LIST_PLURAL.keys():
-                if val and isinstance(val, list):
-                    if len(val) > 0:
-                        json_object[key] = [MODEL_LIST_PLURAL[key].init_from_json(self.network, r) for r in val]
-            elif key in MODEL_LIST_SINGULAR.keys():  # if it is a singular
-                if val and isinstance(val, dict):
-                    if len(val) > 0:
-                        json_object[key] = MODEL_LIST_SINGULAR[key].init_from_json(self.network, val)
+        if key in MODEL_LIST_PLURAL:
+            if val and isinstance(val, list):
+                return [self._init_nested(key, MODEL_LIST_PLURAL[key], r, projection) for r in val]
+        elif key in MODEL_LIST_SINGULAR:  # if it is a singular
+            if val and isinstance(val, dict):
+                return self._init_nested(key, MODEL_LIST_SINGULAR[key], val, projection)
+
+        return val
+
+    def _init_nested(self, key: str, model: type, json_object, projection: dict = None):
+        """Returns the warmed up object from the network's catalog if there is one, and creates a new one otherwise.
+        The catalog is skipped for sub-projections, and for keys that don't hold the endpoint's own resource."""
+        if key in CATALOG_KEYS and projection is None and isinstance(json_object, dict):
+            cached = self.network.catalog.get(model._endpoint_name, {}).get(json_object.get("id"))
+            if cached is not None:
+                return cached
+
+        return model.init_from_json(self.network, json_object, projection)
 
     def _postprocess(self):
         """Optional method. May be used for model specific operations (like purging times)."""
@@ -141,6 +174,34 @@ class BaseModel:
     def _get_all_params(self) -> dict:
         return {k: getattr(self, k, None) for k in self.param_names}
 
+    def _get_params(self, api_names: bool = False) -> dict:
+        """Like _get_all_params, but may use the API names of the fields as keys."""
+        if not api_names:
+            return self._get_all_params()
+
+        return {api_name: getattr(self, pythonic_name, None)
+                for api_name, pythonic_name in self._param_translations.items() if pythonic_name in self.param_names}
+
+    def to_dict(self, api_names: bool = False) -> dict:
+        """
+        Converts the model to a dict, including nested models. Datetimes are converted to ISO 8601 strings.
+
+        :param api_names: Use the API names of the fields instead of the pythonic ones.
+        """
+        from .serialization import to_dict
+
+        return to_dict(self, api_names)
+
+    def to_json(self, api_names: bool = False) -> str:
+        """
+        Dumps the model as JSON, including nested models. Uses orjson if it's installed.
+
+        :param api_names: Use the API names of the fields instead of the pythonic ones.
+        """
+        from .serialization import to_json
+
+        return to_json(self, api_names)
+
     def __repr__(self) -> str:
         subclass_name = self.proper_name
         variables = ",".join("{}={}".format(k, v) for k, v in self._get_all_params().items())
@@ -243,7 +304,11 @@ class Launch(BaseModel):
 
     def _postprocess(self):
         """Changes times to the datetime format."""
+        from dateutil import parser
+
         for time_name in ["windowstart", "windowend", "net"]:
+            if time_name not in self.param_names:
+                continue
             try:
                 # Will need to modify this if we ever implement modes other than detailed
                 setattr(self, time_name, parser.parse(getattr(self, time_name, "")))
@@ -266,15 +331,18 @@ class UpcomingLaunch(Launch):
         super().__init__(network)
 
     @classmethod
-    def next(cls, network: Network, num: int) -> List["UpcomingLaunch"]:
+    def next(cls, network: Network, num: int, fields: Iterable[str] = None,
+             deadline: float = None) -> List["UpcomingLaunch"]:
         """
         A simple abstraction method to get the next {num} launches.
 
         :param network: An instance of launchlibrary.Api
 
         :param num: a number for the number of launches
+        :param fields: Only build these fields. Defaults to all.
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds.
         """
-        return cls.fetch(network, next=num, status=1)
+        return cls.fetch(network, fields, deadline, limit=num, status=1)
 
 
 class Pad(BaseModel):
@@ -359,11 +427,42 @@ class Rocket(BaseModel):
     def _get_pads_for_id(network: Network, pads: str):
         return Pad.fetch(network, id=pads)
 
-    def get_pads(self) -> List[Pad]:
-        """Returns Pad type objects of the pads the rocket uses."""
-        pad_objs = []
+    def _get_catalog_pads(self) -> Optional[List[Pad]]:
+        """Returns the pads of the rocket from the network's catalog, or None if any of them wasn't warmed up."""
+        catalog = self.network.catalog.get(Pad._endpoint_name)
+        if not catalog:
+            return None
+
+        try:
+            pad_ids = [int(pad_id) for pad_id in str(self.default_pads).split(",")]
+        except ValueError:
+            return None
+
+        if not all(pad_id in catalog for pad_id in pad_ids):
+            return None
+        return [catalog[pad_id] for pad_id in pad_ids]
+
+    def get_pads(self, deadline: float = None) -> List[Pad]:
+        """
+        Returns Pad type objects of the pads the rocket uses.
+
+        :param deadline: Raise TimeoutException if the call doesn't complete within this many seconds.
+        """
         if self.default_pads:
-            pad_objs = Rocket._get_pads_for_id(self.network, self.default_pads)
+            catalog_pads = self._get_catalog_pads()
+            if catalog_pads is not None:
+                return catalog_pads
+
+        pad_objs = []
+        with deadline_scope(deadline):
+            if self.default_pads and self.network.engine is not None:
+                # Share the async cache, which lives on the engine's loop, and build sync models from its JSON
+                from .async_models import AsyncRocket
+                json_object = self.network.engine.run(
+                    AsyncRocket._get_pads_json_for_id(self.network, self.default_pads))
+                pad_objs = Pad._create_classes(self.network, json_object)
+            elif self.default_pads:
+                pad_objs = Rocket._get_pads_for_id(self.network, self.default_pads)
 
         return pad_objs
 
@@ -371,5 +470,9 @@ class Rocket(BaseModel):
 # putting it at the end to load the classes first
 MODEL_LIST_PLURAL = {"launch_service_providers": Agency, "pads": Pad, "locations": Location
     , "rockets": Rocket, "launcher_list": Rocket}
-MODEL_LIST_SINGULAR = {"launch_service_provider": Agency, "manufacturer": "Agency", "pad": Pad,
+MODEL_LIST_SINGULAR = {"launch_service_provider": Agency, "manufacturer": Agency, "pad": Pad,
                        "location": Location, "rocket": Rocket, "lsp": Agency}
+# The keys whose nested objects are the same resources as their endpoint's, so they can be taken from the catalog.
+# A launch's "rocket" is a rocket instance, while the Rocket endpoint holds launcher configurations.
+CATALOG_KEYS = {"launch_service_provider", "launch_service_providers", "manufacturer", "lsp", "pad", "pads",
+                "location", "locations"}
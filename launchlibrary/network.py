@@ -11,20 +11,186 @@
 #    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #    See the License for the specific language governing permissions and
 # limitations under the License.
-import asyncio
+import collections
+import contextlib
+import contextvars
+import heapq
+import itertools
+import time
+from typing import Optional
+from urllib.parse import urlencode
 
-import aiohttp
-import aiohttp.web
-import requests
+# requests, asyncio and aiohttp are imported on first use, as they take most of the import time of the package
 from .constants import *
 from launchlibrary import exceptions as ll_exceptions
 
+# The monotonic time by which the current call must complete, if any
+_deadline = contextvars.ContextVar("launchlibrary_deadline", default=None)
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """
+    Every request sent within the scope must complete within {seconds} from now, or TimeoutException is raised.
+    Nested scopes can only shorten the deadline. Covers pagination, relationship lookups and duplicate requests.
+
+    :param seconds: The time budget, in seconds. None means no deadline.
+    """
+    if seconds is None:
+        yield
+        return
+
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(deadline, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _get_remaining() -> Optional[float]:
+    """Returns the seconds left until the deadline, or None if there isn't one. Raises if it has passed."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise ll_exceptions.TimeoutException("The deadline of the call was exceeded")
+    return remaining
+
+
+# The priority of the current call
+_priority = contextvars.ContextVar("launchlibrary_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextlib.contextmanager
+def priority_scope(priority: Optional[int]):
+    """
+    Every async request sent within the scope is scheduled with this priority.
+
+    :param priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND. None keeps the current priority.
+    """
+    if priority is None:
+        yield
+        return
+
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _PriorityLimiter:
+    """Limits the number of concurrent requests. Interactive requests may use all of the slots, while background ones
+    can't use the reserved slots. Waiting requests are let through by priority, and then by order of arrival."""
+
+    def __init__(self, loop, limit: int, reserved: int):
+        self.loop = loop
+        self.limit = limit
+        self.reserved = reserved
+        self.active = 0
+        self._waiters = []  # A heap of (priority, order, future)
+        self._order = itertools.count()
+
+    def _capacity(self, priority: int) -> int:
+        return self.limit if priority <= PRIORITY_INTERACTIVE else self.limit - self.reserved
+
+    async def acquire(self, priority: int):
+        import asyncio
+
+        if self.active < self._capacity(priority):
+            self.active += 1
+            return
+
+        future = self.loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot was handed to us right before the cancellation
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self.active -= 1
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.cancelled():
+                heapq.heappop(self._waiters)
+                continue
+            if self.active >= self._capacity(priority):
+                break
+
+            heapq.heappop(self._waiters)
+            self.active += 1
+            future.set_result(None)
+
 
 class Network:
-    def __init__(self, url=DEFAULT_API_URL, mode="detailed"):
+    def __init__(self, url=DEFAULT_API_URL, mode="detailed", unicode: bool = True, hedge_delay: float = None,
+                 hedge_percentile: float = None, hedge_budget: float = 0.1, engine: "LoopEngine" = None,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, reserved_share: float = DEFAULT_RESERVED_SHARE):
+        """
+        :param url: The URL of the api, including the version.
+        :param mode: The mode of the api responses.
+        :param unicode: Set to False to convert unicode characters in the responses to ASCII.
+        :param hedge_delay: Send a duplicate async request if the first one didn't complete after this many seconds.
+        :param hedge_percentile: Send a duplicate async request if the first one takes longer than this percentile
+                                 (0-100) of the recent response times. Takes precedence over hedge_delay once there
+                                 are enough samples.
+        :param hedge_budget: The maximal ratio of duplicate requests to requests.
+        :param engine: Run all requests, including sync ones, on this engine's loop with the aiohttp transport.
+        :param connect_timeout: The maximal number of seconds to wait for a connection.
+        :param read_timeout: The maximal number of seconds to wait between bytes of a response.
+        :param max_concurrency: The maximal number of concurrent async requests, and connections.
+        :param reserved_share: The share of max_concurrency that only interactive priority requests may use.
+        """
         self.url = url
         self.mode = mode
-        self.sess = aiohttp.ClientSession(raise_for_status=True)
+        self.unicode = unicode
+        self.engine = engine
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_concurrency = max_concurrency
+        # Background requests always get at least one slot
+        self.reserved = min(max_concurrency - 1, int(max_concurrency * reserved_share))
+        self._limiter = None
+        self._sess = None
+        # Warmed up reference data, by endpoint and id. Nested models are taken from here instead of being created
+        self.catalog = {}
+
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = hedge_budget
+        self._latencies = collections.deque(maxlen=HEDGE_LATENCY_SAMPLES)
+        self._sent = 0
+        self._hedged = 0
+
+    @property
+    def sess(self):
+        """The aiohttp session, created on first use."""
+        if self._sess is None:
+            import aiohttp
+
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._sess = aiohttp.ClientSession(raise_for_status=True, timeout=timeout, connector=connector)
+        return self._sess
+
+    @property
+    def limiter(self) -> _PriorityLimiter:
+        """The priority scheduler of async requests, created on first use in the running loop."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        if self._limiter is None or self._limiter.loop is not loop:
+            self._limiter = _PriorityLimiter(loop, self.max_concurrency, self.reserved)
+        return self._limiter
 
     def _get_url(self, endpoint, data: dict) -> str:
         """
@@ -33,7 +199,7 @@ class Network:
         :param data: A dictionary containing values for the api call.
         :return: A proper GET param string
         """
-        params = "?mode={}&".format(self.mode) + "&".join(["{}={}".format(k, v) for k, v in data.items()])
+        params = "?" + urlencode([("mode", self.mode)] + list(data.items()))
         return "/".join([self.url, endpoint]) + params
 
     def send_message(self, endpoint: str, data: dict) -> dict:
@@ -44,9 +210,28 @@ class Network:
         :param data:  A dict containing data for the request
         :return:  response dict.
         """
+        if self.engine is not None:
+            import concurrent.futures
+
+            # The coroutine enforces the deadline too, this only stops the caller from waiting past it. The remaining
+            # time is checked first, so a passed deadline doesn't leave a coroutine that's never awaited.
+            remaining = _get_remaining()
+            try:
+                return self.engine.run(self.async_send_message(endpoint, data), remaining)
+            except concurrent.futures.TimeoutError:
+                raise ll_exceptions.TimeoutException("The deadline of the call was exceeded") from None
+
+        import requests
+
         request_url = self._get_url(endpoint, data)
+        # requests can't limit the total time of a request, so the deadline only caps the timeouts
+        remaining = _get_remaining()
+        timeout = (self.connect_timeout, self.read_timeout)
+        if remaining is not None:
+            timeout = tuple(remaining if t is None else min(t, remaining) for t in timeout)
+
         try:
-            resp = requests.get(request_url)
+            resp = requests.get(request_url, timeout=timeout)
             resp.raise_for_status()
             resp_dict = resp.json()
 
@@ -58,6 +243,8 @@ class Network:
         except requests.exceptions.RequestException as e:
             raise ll_exceptions.NetworkException(str(e))
 
+        # The timeouts are per read, so a slow response may complete after the deadline
+        _get_remaining()
         return resp_dict  # Returns a json style object of the response.
 
     async def async_send_message(self, endpoint: str, data: dict):
@@ -68,7 +255,44 @@ class Network:
         :param data:  A dict containing data for the request
         :return:  response dict.
         """
+        if self.engine is not None and not self.engine.in_loop():
+            return await self.engine.run_async(self.async_send_message(endpoint, data))
+
+        import asyncio
+
         request_url = self._get_url(endpoint, data)
+        remaining = _get_remaining()
+        self._sent += 1
+
+        delay = self._get_hedge_delay()
+        if delay is None:
+            request = self._async_get(request_url)
+        else:
+            request = self._hedged_get(request_url, delay)
+
+        if remaining is None:
+            return await request
+
+        try:
+            return await asyncio.wait_for(request, remaining)
+        except asyncio.TimeoutError:
+            raise ll_exceptions.TimeoutException("The deadline of the call was exceeded")
+
+    async def _async_get(self, request_url: str, acquired: "asyncio.Event" = None) -> dict:
+        """
+        Sends a single asynchronous GET request when the scheduler allows it, and records its response time.
+
+        :param request_url: The URL to GET
+        :param acquired: An event to set once the request gets its slot, and is actually sent.
+        """
+        import asyncio
+        import aiohttp
+
+        limiter = self.limiter
+        await limiter.acquire(_priority.get())
+        if acquired is not None:
+            acquired.set()
+        start = time.monotonic()
         try:
             async with self.sess.get(request_url) as resp:
                 resp_dict = await resp.json()
@@ -76,13 +300,59 @@ class Network:
         # Don't leak implementation details
         except asyncio.TimeoutError as e:
             raise ll_exceptions.TimeoutException(str(e))
-        except aiohttp.web.HTTPClientError as e:
+        except aiohttp.ClientResponseError as e:
             raise ll_exceptions.ApiException(str(e))
         except aiohttp.ClientError as e:
             raise ll_exceptions.NetworkException(str(e))
+        finally:
+            limiter.release()
 
+        self._latencies.append(time.monotonic() - start)
         return resp_dict  # Returns a json style object of the response.
 
+    def _get_hedge_delay(self) -> Optional[float]:
+        """Returns the number of seconds to wait before hedging a request, or None if it shouldn't be hedged."""
+        if self.hedge_percentile is not None and len(self._latencies) >= HEDGE_MIN_SAMPLES:
+            latencies = sorted(self._latencies)
+            index = min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile / 100))
+            return latencies[index]
+
+        return self.hedge_delay
+
+    async def _hedged_get(self, request_url: str, delay: float) -> dict:
+        """
+        Sends a GET request, and sends a duplicate one if it didn't complete after {delay} seconds and the budget allows.
+        The delay starts once the request gets its slot, as a request that waits for one isn't slow upstream, and the
+        recorded response times don't include that wait either. The first successful response is returned, and the
+        other request is cancelled. All of our requests are idempotent GETs, so that's safe.
+        """
+        import asyncio
+
+        acquired = asyncio.Event()
+        tasks = [asyncio.ensure_future(self._async_get(request_url, acquired))]
+        waiter = asyncio.ensure_future(acquired.wait())
+        try:
+            await asyncio.wait([tasks[0], waiter], return_when=asyncio.FIRST_COMPLETED)
+            done, pending = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._hedged < self.hedge_budget * self._sent:
+                self._hedged += 1
+                tasks.append(asyncio.ensure_future(self._async_get(request_url)))
+
+            error = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+
+            raise error
+        finally:
+            waiter.cancel()
+            for task in tasks:
+                task.cancel()
+
     # For lru_cache. We're not hashing the sess because it doesn't affect responses
     def __hash__(self):
-        return hash((self.url, self.mode))
+        return hash((self.url, self.mode, self.unicode))
@@ -0,0 +1,189 @@
+# Copyright 2020 Nir Harel
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A query builder that pushes filters, ordering and limits to the api."""
+
+import copy
+import datetime
+from typing import Optional, Type
+from launchlibrary import utils
+from .constants import PAGE_LIMIT
+from .models import BaseModel
+from .network import Network, deadline_scope, priority_scope
+
+
+def _to_param(value) -> str:
+    """Converts a python value to its representation in the api's GET params."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return _to_param(value.id)
+    if isinstance(value, (list, tuple, set)):
+        return ",".join(_to_param(v) for v in value)
+    return str(value)
+
+
+class Query:
+    """A lazy query on an endpoint. Every method returns a new query, so they can be chained and reused.
+
+    Filters use the api's native names, including lookups such as ``net__gte``, and ordering fields may be prefixed
+    with "-" for a descending order.
+
+    .. code:: py
+
+      launches = api.launches().where(net__gte=datetime.datetime.now(), lsp__id=121).order_by("net").limit(5).fetch()
+    """
+
+    def __init__(self, network: Network, model: Type[BaseModel], async_model: Type[BaseModel] = None):
+        """
+        :param network: An instance of the network class
+        :param model: The model that fetch creates
+        :param async_model: The model that async_fetch creates. Defaults to the async variant of the sync model.
+        """
+        self.network = network
+        self._model = model
+        self._async_model = async_model
+        self._filters = {}
+        self._ordering = []
+        self._limit = None
+        self._offset = 0
+        self._all = False
+        self._fields = None
+
+    def _clone(self) -> "Query":
+        query = copy.copy(self)
+        query._filters = dict(self._filters)
+        query._ordering = list(self._ordering)
+        return query
+
+    def where(self, **filters) -> "Query":
+        """Filters the results by the given params, like net__gte=datetime or lsp__id=121."""
+        query = self._clone()
+        query._filters.update(filters)
+        return query
+
+    def order_by(self, *fields: str) -> "Query":
+        """Orders the results by the given fields. Prefix a field with "-" for a descending order."""
+        query = self._clone()
+        query._ordering = list(fields)
+        return query
+
+    def limit(self, num: int) -> "Query":
+        """Fetches at most {num} results, paginating if the api returns less per page."""
+        if num < 0:
+            raise ValueError("The limit of a query can't be negative")
+        query = self._clone()
+        query._limit = num
+        return query
+
+    def offset(self, num: int) -> "Query":
+        """Skips the first {num} results."""
+        query = self._clone()
+        query._offset = num
+        return query
+
+    def all(self) -> "Query":
+        """Fetches every page of the results, unless there's a limit."""
+        query = self._clone()
+        query._all = True
+        return query
+
+    def only(self, *fields: str) -> "Query":
+        """Only builds these fields of the models (pythonic or API names, nested ones separated by dots)."""
+        query = self._clone()
+        query._fields = fields
+        return query
+
+    def params(self, fetched: int = 0) -> dict:
+        """
+        Returns the GET params of the query.
+
+        :param fetched: The number of results that were already fetched, for pagination.
+        """
+        params = {k: _to_param(v) for k, v in self._filters.items()}
+        if self._ordering:
+            params["ordering"] = ",".join(self._ordering)
+
+        if self._limit is not None:
+            params["limit"] = min(PAGE_LIMIT, self._limit - fetched)
+        elif self._all:
+            params["limit"] = PAGE_LIMIT
+
+        if self._offset + fetched:
+            params["offset"] = self._offset + fetched
+
+        # The values are escaped by urlencode, but the mode is always set by the network
+        params.pop("mode", None)
+        return params
+
+    def _next_params(self, fetched: int, response: dict) -> Optional[dict]:
+        """Returns the params of the next page, or None if there's nothing left to fetch."""
+        if not response.get("next"):
+            return None
+        if self._limit is None and not self._all:
+            return None
+        if self._limit is not None and fetched >= self._limit:
+            return None
+
+        return self.params(fetched)
+
+    def fetch(self, deadline: float = None) -> list:
+        """
+        Runs the query, and returns the models it found.
+
+        :param deadline: Raise TimeoutException if all of the pages aren't fetched within this many seconds.
+        """
+        if self._limit == 0:
+            return []
+
+        projection = utils.parse_fields(self._fields)
+        results = []
+        params = self.params()
+        with deadline_scope(deadline):
+            while params is not None:
+                response = self.network.send_message(self._model._endpoint_name, params)
+                results.extend(self._model._create_classes(self.network, response, projection))
+                params = self._next_params(len(results), response)
+
+        return results if self._limit is None else results[:self._limit]
+
+    async def async_fetch(self, deadline: float = None, priority: int = None) -> list:
+        """
+        Runs the query asynchronously, and returns the models it found.
+
+        :param deadline: Raise TimeoutException if all of the pages aren't fetched within this many seconds.
+        :param priority: PRIORITY_INTERACTIVE (the default) or PRIORITY_BACKGROUND, for bulk jobs.
+        """
+        if self._limit == 0:
+            return []
+
+        # Imported here, so sync users don't have to load the async stack
+        from .async_models import ASYNC_MODELS
+
+        model = self._async_model or ASYNC_MODELS.get(self._model, self._model)
+        projection = utils.parse_fields(self._fields)
+        results = []
+        params = self.params()
+        with deadline_scope(deadline), priority_scope(priority):
+            while params is not None:
+                response = await self.network.async_send_message(model._endpoint_name, params)
+                results.extend(model._create_classes(self.network, response, projection))
+                params = self._next_params(len(results), response)
+
+        return results if self._limit is None else results[:self._limit]
+
+    def __repr__(self) -> str:
+        return "Query({}, {})".format(self._model.__name__, self.params())
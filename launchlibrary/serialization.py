@@ -0,0 +1,89 @@
+# Copyright 2020 Nir Harel
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Serializes models back to dicts and JSON. orjson is used if it's installed."""
+
+import datetime
+import json
+from functools import lru_cache
+from typing import Iterable, List
+from .models import BaseModel
+
+
+@lru_cache(maxsize=None)
+def _get_orjson():
+    """Returns the orjson module, or None if it isn't installed. Cached, as failed imports are slow."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def _to_primitive(value, api_names: bool):
+    """Recursively converts models, lists and datetimes to plain python objects."""
+    if isinstance(value, BaseModel):
+        return to_dict(value, api_names)
+    if isinstance(value, (list, tuple)):
+        return [_to_primitive(v, api_names) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_primitive(v, api_names) for k, v in value.items()}
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def to_dict(model: BaseModel, api_names: bool = False) -> dict:
+    """
+    Converts a model to a dict, including the nested models.
+
+    :param model: The model to convert
+    :param api_names: Use the API names of the fields instead of the pythonic ones.
+    :return: A dict that can be dumped as JSON.
+    """
+    return {k: _to_primitive(v, api_names) for k, v in model._get_params(api_names).items()}
+
+
+def to_dicts(models: Iterable[BaseModel], api_names: bool = False) -> List[dict]:
+    """
+    Converts a list of models to dicts, including the nested models.
+
+    :param models: The models to convert
+    :param api_names: Use the API names of the fields instead of the pythonic ones.
+    """
+    return [to_dict(model, api_names) for model in models]
+
+
+def to_json(models, api_names: bool = False) -> str:
+    """
+    Dumps a model, or a list of them, as JSON.
+
+    The models are handed to the JSON encoder as they are, and every model is only converted to a shallow dict
+    of its fields when the encoder reaches it, so the full tree of dicts is never built.
+
+    :param models: A model, or a list of them
+    :param api_names: Use the API names of the fields instead of the pythonic ones.
+    """
+    def default(obj):
+        if isinstance(obj, BaseModel):
+            return obj._get_params(api_names)
+        if isinstance(obj, (datetime.datetime, datetime.date)):
+            return obj.isoformat()
+        raise TypeError("Object of type {} is not JSON serializable".format(type(obj).__name__))
+
+    orjson = _get_orjson()
+    if orjson is not None:
+        return orjson.dumps(models, default=default).decode()
+
+    return json.dumps(models, default=default)
@@ -14,6 +14,9 @@
 
 """Contains simple utility functions for use within the wrapper."""
 
+from functools import lru_cache
+from .constants import TRANSLITERATION_CACHE_SIZE
+
 ILLEGAL_CHARS = '&=/\\'
 
 
@@ -33,3 +36,48 @@ def sanitize_input(args: dict) -> dict:
             args[k] = v.translate(trans)
 
     return args
+
+
+def parse_fields(fields) -> dict:
+    """
+    Turns a list of requested fields into a projection tree for the models.
+
+    Nested fields are separated by dots, so ``["name", "pad.location.name"]`` becomes
+    ``{"name": None, "pad": {"location": {"name": None}}}``. A value of None means that the whole field is needed.
+    :param fields: An iterable of field names, either pythonic or API names. None means all fields.
+    :return: The projection tree, or None if there's no projection.
+    """
+    if fields is None:
+        return None
+
+    if isinstance(fields, str):
+        fields = [fields]
+
+    tree = {}
+    for field in fields:
+        node = tree
+        *parents, leaf = field.split(".")
+        for parent in parents:
+            # A field that was already requested in full stays that way
+            if parent in node and node[parent] is None:
+                break
+            node = node.setdefault(parent, {})
+        else:
+            node[leaf] = None
+
+    return tree
+
+
+@lru_cache(maxsize=TRANSLITERATION_CACHE_SIZE)
+def transliterate(text: str) -> str:
+    """
+    Converts unicode characters to ASCII using unidecode.
+
+    Names, countries and agencies repeat a lot between objects, so the results are memoized. The cache is shared
+    between all networks, as the conversion doesn't depend on any of them.
+    :param text: The string to convert
+    :return: An ASCII only string
+    """
+    from unidecode import unidecode
+
+    return unidecode(text)
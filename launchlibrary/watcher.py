@@ -0,0 +1,168 @@
+# Copyright 2020 Nir Harel
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Watchers that poll the upcoming launches and report what changed between polls."""
+
+import datetime
+import time
+from typing import List, Iterator, AsyncIterator, Optional, Iterable
+from .exceptions import LlException
+from .models import UpcomingLaunch
+from .network import Network
+
+
+class LaunchEvent:
+    """A change that was noticed in an upcoming launch.
+
+    :kind: One of the kinds listed below.
+    :launch: The launch, as it was in the latest poll.
+    :previous: The launch, as it was in the poll before. None for new launches.
+    """
+
+    NEW = "new"
+    NET_SLIP = "net_slip"
+    STATUS_CHANGE = "status_change"
+    HOLD = "hold"
+
+    def __init__(self, kind: str, launch: UpcomingLaunch, previous: UpcomingLaunch = None):
+        self.kind = kind
+        self.launch = launch
+        self.previous = previous
+
+    def __repr__(self) -> str:
+        return "LaunchEvent(kind={},launch={})".format(self.kind, getattr(self.launch, "name", None))
+
+
+def _status_id(status):
+    """The status is an object in LL2, but it used to be an id."""
+    if isinstance(status, dict):
+        return status.get("id")
+    return status
+
+
+class LaunchWatcher:
+    """Polls the next launches, and schedules the polls according to how close the nearest launch is.
+
+    Polls happen every `interval_ratio` of the time left until the nearest launch, clamped between `min_interval` and
+    `max_interval`. The first poll only records the launches, and every poll after it reports the changes as
+    LaunchEvent objects."""
+
+    _model = UpcomingLaunch
+
+    def __init__(self, network: Network, num: int = 10, min_interval: float = 30, max_interval: float = 6 * 3600,
+                 interval_ratio: float = 0.1, fields: Iterable[str] = None):
+        """
+        :param network: An instance of the network class
+        :param num: The number of upcoming launches to watch
+        :param min_interval: The minimal time between polls, in seconds
+        :param max_interval: The maximal time between polls, in seconds
+        :param interval_ratio: The part of the time left until the nearest launch to wait between polls
+        :param fields: Only build these fields of the launches. The watcher needs id, net, windowstart, status, inhold
+                       and changed.
+        """
+        self.network = network
+        self.num = num
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval_ratio = interval_ratio
+        self.fields = fields
+        self.launches = None  # The latest snapshot, by id
+
+    def _diff(self, launches: List[UpcomingLaunch]) -> List[LaunchEvent]:
+        """Replaces the snapshot with the given launches, and returns the changes between them."""
+        previous_launches = self.launches
+        self.launches = {launch.id: launch for launch in launches}
+        if previous_launches is None:
+            return []
+
+        events = []
+        for launch in launches:
+            previous = previous_launches.get(launch.id)
+            if previous is None:
+                events.append(LaunchEvent(LaunchEvent.NEW, launch))
+                continue
+
+            # Nothing to compare if the api says that the launch didn't change
+            if launch.changed is not None and launch.changed == previous.changed:
+                continue
+
+            if launch.net != previous.net or launch.windowstart != previous.windowstart:
+                events.append(LaunchEvent(LaunchEvent.NET_SLIP, launch, previous))
+            if _status_id(launch.status) != _status_id(previous.status):
+                events.append(LaunchEvent(LaunchEvent.STATUS_CHANGE, launch, previous))
+            if launch.inhold and not previous.inhold:
+                events.append(LaunchEvent(LaunchEvent.HOLD, launch, previous))
+
+        return events
+
+    def _nearest_launch_time(self) -> Optional[datetime.datetime]:
+        """The nearest net/windowstart of the watched launches. Launches that should've happened over an hour ago
+        are ignored, as they're probably scrubbed and waiting for a new date."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        times = [t for launch in (self.launches or {}).values() for t in (launch.net, launch.windowstart)
+                 if t is not None and t.tzinfo is not None and t > now - datetime.timedelta(hours=1)]
+        return min(times, default=None)
+
+    def next_interval(self) -> float:
+        """Returns the number of seconds to wait until the next poll."""
+        nearest = self._nearest_launch_time()
+        if nearest is None:
+            return self.max_interval
+
+        remaining = (nearest - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        return min(self.max_interval, max(self.min_interval, remaining * self.interval_ratio))
+
+    def poll(self) -> List[LaunchEvent]:
+        """Fetches the next launches, and returns the changes since the previous poll."""
+        return self._diff(self._model.fetch(self.network, self.fields, limit=self.num))
+
+    def watch(self) -> Iterator[LaunchEvent]:
+        """Polls forever, yielding the changes as they're noticed. Failed polls keep the last snapshot, and are
+        retried after `min_interval`."""
+        while True:
+            try:
+                events = self.poll()
+            except LlException:
+                time.sleep(self.min_interval)
+                continue
+
+            yield from events
+            time.sleep(self.next_interval())
+
+
+class AsyncLaunchWatcher(LaunchWatcher):
+    """A watcher that polls asynchronously."""
+
+    async def poll(self) -> List[LaunchEvent]:
+        """Fetches the next launches, and returns the changes since the previous poll."""
+        # Imported here, so sync users don't have to load the async stack
+        from .async_models import AsyncUpcomingLaunch
+
+        return self._diff(await AsyncUpcomingLaunch.fetch(self.network, self.fields, limit=self.num))
+
+    async def watch(self) -> AsyncIterator[LaunchEvent]:
+        """Polls forever, yielding the changes as they're noticed. Failed polls keep the last snapshot, and are
+        retried after `min_interval`."""
+        import asyncio
+
+        while True:
+            try:
+                events = await self.poll()
+            except LlException:
+                await asyncio.sleep(self.min_interval)
+                continue
+
+            for event in events:
+                yield event
+            await asyncio.sleep(self.next_interval())
@@ -21,7 +21,6 @@ setuptools.setup(
         "License :: OSI Approved :: Apache Software License",
         "Operating System :: OS Independent",
         "Development Status :: 4 - Beta",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8"
     ],
@@ -32,5 +31,8 @@ setuptools.setup(
         "unidecode>=1,<2",
         "async_lru>=1.0.2,<2"
     ],
-    python_requires='>=3.6'
+    extras_require={
+        "geo": ["numpy"]
+    },
+    python_requires='>=3.7'
 )